@@ -1,12 +1,14 @@
 import threading
+from concurrent.futures import ProcessPoolExecutor
 import tkinter as tk
 from tkinter import messagebox, ttk, simpledialog, filedialog
-import random
-import pandas as pd
+import numpy as np
 
-from db import init_db, list_companies, delete_company, add_company, add_document, update_company_totals, list_documents, get_company, mark_document_suspicious, update_document_reported
+from db import init_db, list_companies, delete_company, add_company, add_documents_bulk, update_company_totals, list_documents, get_company, mark_document_suspicious, update_document_reported, delete_all_companies as db_delete_all_companies
 from data_seed import seed_database
-from ml import compute_and_update_risk
+
+# pandas ve ml (sklearn'i de çeker) ağır modüllerdir; pencere açılışını
+# geciktirmemek için ilgili özellik kullanılana kadar import edilmezler.
 
 DB_PATH = "app.db"
 
@@ -59,6 +61,30 @@ THEMES = {
 # Varsayılan tema
 COLORS = THEMES["light"]
 
+# Arka plan işleri için süreç havuzu: CPU-yoğun işler (seed, risk hesabı)
+# ayrı bir yorumlayıcıda çalışır, GIL Tk mainloop'unu kilitlemez.
+_EXECUTOR = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+	global _EXECUTOR
+	if _EXECUTOR is None:
+		_EXECUTOR = ProcessPoolExecutor(max_workers=1)
+	return _EXECUTOR
+
+
+def _seed_and_compute_job(db_path: str):
+	"""Seed + risk hesabını çalıştıran, süreç havuzuna gönderilebilir iş."""
+	from ml import compute_and_update_risk
+	seed_database(db_path, companies=1000)
+	compute_and_update_risk(db_path)
+
+
+def _compute_risk_job(db_path: str):
+	"""Risk hesabını çalıştıran, süreç havuzuna gönderilebilir iş."""
+	from ml import compute_and_update_risk
+	compute_and_update_risk(db_path)
+
 
 class AddCompanyDialog(simpledialog.Dialog):
 	def body(self, master):
@@ -105,12 +131,10 @@ class AddCompanyDialog(simpledialog.Dialog):
 		self.gen_docs_chk.grid(row=3, column=1, sticky=tk.W, padx=6, pady=10)
 		return self.name_entry
 
-	def _validate_tax_input(self, new_value):
-		# Sadece rakam kabul et ve maksimum 10 karakter
-		if len(new_value) > 10:
-			return False
-		# Boş string veya sadece rakamlar
-		return new_value == "" or new_value.isdigit()
+	@staticmethod
+	def _validate_tax_input(new_value):
+		# Sadece rakam kabul et ve maksimum 10 karakter (tek boolean ifade)
+		return len(new_value) <= 10 and (new_value == "" or new_value.isdigit())
 
 	def validate(self):
 		name = (self.name_var.get() or "").strip()
@@ -139,6 +163,10 @@ class CompanyDetailWindow(tk.Toplevel):
 		self.refresh()
 
 	def _build_ui(self):
+		# Son çekilen belge satırlarının bellek içi kopyası:
+		# tekil değişikliklerde DB'den yeniden yükleme yapılmaz
+		self._doc_rows = {}   # doc_id -> db satır tuple'ı
+		self._doc_iids = {}   # doc_id -> tree iid
 		# Detay bilgileri kısmı
 		self.info_frame = tk.Frame(self, bg=COLORS["bg_secondary"], relief=tk.FLAT, bd=0)
 		self.info_frame.pack(side=tk.TOP, fill=tk.X, padx=12, pady=12)
@@ -232,11 +260,11 @@ class CompanyDetailWindow(tk.Toplevel):
 		self.tree.tag_configure("gelir", foreground=COLORS["gelir"], font=("Segoe UI", 9))
 		self.tree.tag_configure("gider", foreground=COLORS["gider"], font=("Segoe UI", 9))
 
-		scroll_y = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview, style="Vertical.TScrollbar")
-		self.tree.configure(yscrollcommand=scroll_y.set)
+		self.scroll_y = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview, style="Vertical.TScrollbar")
+		self.tree.configure(yscrollcommand=self.scroll_y.set)
 		self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-		scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
-	
+		self.scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+
 	def _create_button(self, parent, text, bg_color, hover_color, command):
 		btn = tk.Button(parent, text=text, command=command, font=("Segoe UI", 9),
 		               bg=bg_color, fg="white", relief=tk.FLAT, bd=0, padx=12, pady=6,
@@ -254,18 +282,37 @@ class CompanyDetailWindow(tk.Toplevel):
 		self.lbl_tax_val.config(text=tax)
 		self.lbl_risk_val.config(text=f"{risk_level} ({risk_score:.1f})  Gelir: {revenue:,.2f}  Gider: {expenses:,.2f}")
 
-		for i in self.tree.get_children():
-			self.tree.delete(i)
-		docs = list_documents(self.company_id, db_path=DB_PATH)
-		for d in docs:
-			doc_id, doc_type, amount, reported, vendor, date, suspicious = d
-			flow = "Gelir" if doc_type == "FATURA" else "Gider"
-			amount_disp = f"{amount:,.2f}" if flow == "Gelir" else f"-{amount:,.2f}"
-			tag_flow = "gelir" if flow == "Gelir" else "gider"
-			tags = (tag_flow,) + (("suspicious",) if int(suspicious) == 1 else tuple())
-			rep_txt = "Evet" if int(reported) == 1 else "Hayır"
-			sus_txt = "Evet" if int(suspicious) == 1 else "Hayır"
-			self.tree.insert("", tk.END, values=(doc_id, flow, doc_type, amount_disp, rep_txt, vendor or "-", date, sus_txt), tags=tags)
+		# Doldurma sırasında ağacı geometriden ayır: Tk her insert için layout tetiklemesin
+		self.tree.pack_forget()
+		try:
+			self.tree.delete(*self.tree.get_children())
+			self._doc_rows = {}
+			self._doc_iids = {}
+			docs = list_documents(self.company_id, db_path=DB_PATH)
+			for d in docs:
+				values, tags = self._format_doc_row(d)
+				iid = self.tree.insert("", tk.END, values=values, tags=tags)
+				self._doc_rows[d[0]] = d
+				self._doc_iids[d[0]] = iid
+		finally:
+			self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, before=self.scroll_y)
+
+	def _format_doc_row(self, d):
+		"""Bir belge satırını Treeview değerlerine ve tag'lerine dönüştürür."""
+		doc_id, doc_type, amount, reported, vendor, date, suspicious = d
+		flow = "Gelir" if doc_type == "FATURA" else "Gider"
+		amount_disp = f"{amount:,.2f}" if flow == "Gelir" else f"-{amount:,.2f}"
+		tag_flow = "gelir" if flow == "Gelir" else "gider"
+		tags = (tag_flow,) + (("suspicious",) if int(suspicious) == 1 else tuple())
+		rep_txt = "Evet" if int(reported) == 1 else "Hayır"
+		sus_txt = "Evet" if int(suspicious) == 1 else "Hayır"
+		return (doc_id, flow, doc_type, amount_disp, rep_txt, vendor or "-", date, sus_txt), tags
+
+	def _update_doc_row(self, doc_id: int, new_row):
+		"""Bellekteki kopyayı ve ilgili Treeview satırını tek başına günceller."""
+		self._doc_rows[doc_id] = new_row
+		values, tags = self._format_doc_row(new_row)
+		self.tree.item(self._doc_iids[doc_id], values=values, tags=tags)
 
 	def _get_selected_doc_id(self) -> int:
 		cur = self.tree.selection()
@@ -279,44 +326,59 @@ class CompanyDetailWindow(tk.Toplevel):
 		if doc_id < 0:
 			messagebox.showinfo("Bilgi", "Lütfen bir belge seçin.")
 			return
-		# determine current value from row
-		values = self.tree.item(self.tree.selection()[0], "values")
-		current = (values[7] == "Evet")
+		d = self._doc_rows.get(doc_id)
+		if d is None:
+			self.refresh()
+			return
+		current = (int(d[6]) == 1)
 		mark_document_suspicious(doc_id, not current, db_path=DB_PATH)
-		self.refresh()
+		# Sadece bu satırı güncelle; tüm belgeleri yeniden yükleme
+		self._update_doc_row(doc_id, d[:6] + (0 if current else 1,))
 
 	def toggle_selected_reported(self):
 		doc_id = self._get_selected_doc_id()
 		if doc_id < 0:
 			messagebox.showinfo("Bilgi", "Lütfen bir belge seçin.")
 			return
-		values = self.tree.item(self.tree.selection()[0], "values")
-		current = (values[4] == "Evet")
+		d = self._doc_rows.get(doc_id)
+		if d is None:
+			self.refresh()
+			return
+		current = (int(d[3]) == 1)
 		update_document_reported(doc_id, not current, db_path=DB_PATH)
-		self.refresh()
+		# Sadece bu satırı güncelle; tüm belgeleri yeniden yükleme
+		self._update_doc_row(doc_id, d[:3] + (0 if current else 1,) + d[4:])
 
 	def export_excel(self):
+		import pandas as pd
 		path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel", "*.xlsx")], title="Excel olarak kaydet")
 		if not path:
 			return
 		docs = list_documents(self.company_id, db_path=DB_PATH)
 		df = pd.DataFrame(docs, columns=["id", "type", "amount", "reported", "vendor", "date", "suspicious"])
-		df["flow"] = df["type"].map(lambda t: "Gelir" if t == "FATURA" else "Gider")
-		df["amount_display"] = df.apply(lambda r: ("-" if r["flow"] == "Gider" else "") + f"{float(r['amount']):,.2f}", axis=1)
-		df["reported"] = df["reported"].map(lambda x: "Evet" if int(x) == 1 else "Hayır")
-		df["suspicious"] = df["suspicious"].map(lambda x: "Evet" if int(x) == 1 else "Hayır")
+		# Satır başına lambda yerine vektörel maskelerle formatla
+		df["flow"] = np.where(df["type"].to_numpy() == "FATURA", "Gelir", "Gider")
+		sign = np.where(df["flow"].to_numpy() == "Gider", "-", "")
+		df["amount_display"] = sign + df["amount"].astype(float).map("{:,.2f}".format)
+		df["reported"] = np.where(df["reported"].astype(int).to_numpy() == 1, "Evet", "Hayır")
+		df["suspicious"] = np.where(df["suspicious"].astype(int).to_numpy() == 1, "Evet", "Hayır")
 		df = df[["id", "flow", "type", "amount_display", "reported", "vendor", "date", "suspicious"]]
 		df.columns = ["id", "akış", "tür", "tutar", "beyan", "tedarikçi", "tarih", "şüpheli"]
-		df.to_excel(path, index=False)
+		# xlsxwriter, openpyxl'den belirgin biçimde daha az bellek kullanır.
+		# constant_memory kullanılmaz: to_excel hücreleri sütun sütun yazar,
+		# o mod ise satır sırası dışındaki yazmaları sessizce düşürür.
+		with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+			df.to_excel(writer, index=False)
 		messagebox.showinfo("Tamam", "Excel dışa aktarıldı.")
 
 	def recompute_company_risk(self):
-		# Basit çözüm: küresel risk hesaplamayı çalıştır, ardından yalnızca bu pencereyi yenile
+		# Yalnızca bu şirketi yeniden hesapla, tüm veritabanını değil
 		self.config(cursor="watch")
 		self.title("Risk hesaplanıyor... - Şirket Detayı")
 		def wrapper():
 			try:
-				compute_and_update_risk(DB_PATH)
+				from ml import compute_and_update_risk
+				compute_and_update_risk(DB_PATH, company_ids=[self.company_id])
 			except Exception as e:
 				self.after(0, lambda: messagebox.showerror("Hata", str(e)))
 			finally:
@@ -336,6 +398,14 @@ class App(tk.Tk):
 		self.geometry("1050x600")
 		self.current_theme = "light"
 		self.configure(bg=COLORS["bg_primary"])
+		# Belge üretimi için RNG bir kez tohumlanır ve tekrar kullanılır
+		self._rng = np.random.default_rng()
+		# Tema kayıtları: widget'lar oluşturulurken rol bazında listelenir,
+		# tema değişiminde ağaç gezmek yerine bu listeler üzerinden boyanır
+		self._themed_frames_primary = []
+		self._themed_frames_toolbar = []
+		self._themed_labels_toolbar = []
+		self._themed_entries = []
 		self._setup_style()
 		self._setup_widgets()
 		self._init_and_seed()
@@ -357,13 +427,16 @@ class App(tk.Tk):
 		toolbar = tk.Frame(self, bg=COLORS["bg_toolbar"], relief=tk.FLAT, bd=0, height=60)
 		toolbar.pack(side=tk.TOP, fill=tk.X)
 		toolbar.pack_propagate(False)
-		
+		self._themed_frames_toolbar.append(toolbar)
+
 		toolbar_inner = tk.Frame(toolbar, bg=COLORS["bg_toolbar"], padx=12, pady=10)
 		toolbar_inner.pack(fill=tk.BOTH, expand=True)
+		self._themed_frames_toolbar.append(toolbar_inner)
 
 		# Butonlar
 		btn_frame = tk.Frame(toolbar_inner, bg=COLORS["bg_toolbar"])
 		btn_frame.pack(side=tk.LEFT)
+		self._themed_frames_toolbar.append(btn_frame)
 
 		self.btn_refresh = self._create_button(btn_frame, "Yenile", COLORS["accent_blue"], 
 		                                     COLORS["hover_blue"], self.refresh)
@@ -401,10 +474,12 @@ class App(tk.Tk):
 		# Arama kontrolleri
 		search_frame = tk.Frame(toolbar_inner, bg=COLORS["bg_toolbar"])
 		search_frame.pack(side=tk.RIGHT)
-		
-		lbl = tk.Label(search_frame, text="Ara:", font=("Segoe UI", 9), 
+		self._themed_frames_toolbar.append(search_frame)
+
+		lbl = tk.Label(search_frame, text="Ara:", font=("Segoe UI", 9),
 		             bg=COLORS["bg_toolbar"], fg="white")
 		lbl.pack(side=tk.LEFT, padx=(0, 6))
+		self._themed_labels_toolbar.append(lbl)
 		
 		self.search_var = tk.StringVar()
 		self.search_entry = tk.Entry(search_frame, textvariable=self.search_var, width=28,
@@ -413,7 +488,12 @@ class App(tk.Tk):
 		                            highlightcolor=COLORS["accent_blue"], bg=COLORS["bg_secondary"],
 		                            fg=COLORS["text_primary"], insertbackground=COLORS["text_primary"])
 		self.search_entry.pack(side=tk.LEFT, padx=2)
-		self.search_entry.bind("<Return>", lambda _e: self.refresh())
+		self._themed_entries.append(self.search_entry)
+		self.search_entry.bind("<Return>", self._on_search_enter)
+		# Canlı arama: tuş vuruşları 250 ms'lik pencerede birleştirilir,
+		# her tuşta değil yazma durunca tek refresh çalışır
+		self._search_after_id = None
+		self.search_entry.bind("<KeyRelease>", self._on_search_typed)
 		
 		self.btn_search = self._create_button(search_frame, "Ara", COLORS["accent_blue"], 
 		                                    COLORS["hover_blue"], self.refresh)
@@ -426,6 +506,7 @@ class App(tk.Tk):
 		# Belge ağacı kısmı
 		tree_frame = tk.Frame(self, bg=COLORS["bg_primary"])
 		tree_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=12, pady=(0, 12))
+		self._themed_frames_primary.append(tree_frame)
 
 		cols = ("id", "name", "tax", "revenue", "expenses", "risk_score", "risk_level", "created")
 		self.tree = ttk.Treeview(tree_frame, columns=cols, show="headings", height=22)
@@ -453,10 +534,10 @@ class App(tk.Tk):
 
 		self.tree.bind("<Double-1>", self.on_double_click_row)
 
-		scroll_y = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview, style="Vertical.TScrollbar")
-		self.tree.configure(yscrollcommand=scroll_y.set)
+		self.scroll_y = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview, style="Vertical.TScrollbar")
+		self.tree.configure(yscrollcommand=self.scroll_y.set)
 		self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-		scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+		self.scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
 	
 	def _create_button(self, parent, text, bg_color, hover_color, command):
 		btn = tk.Button(parent, text=text, command=command, font=("Segoe UI", 9),
@@ -494,103 +575,100 @@ class App(tk.Tk):
 		style.configure("Vertical.TScrollbar", background=COLORS["bg_secondary"], 
 		               troughcolor=COLORS["bg_primary"], borderwidth=0, arrowcolor=COLORS["text_secondary"])
 		
-		# Toolbar ve içindeki widget'lar
-		for widget in self.winfo_children():
-			if isinstance(widget, tk.Frame):
-				self._update_widget_colors(widget)
-		
-		# Treeview tag'leri güncelle
+		# Kayıtlı widget'ları rol bazında boya (ağaç gezme ve isim ayrıştırma yok)
+		for frame in self._themed_frames_toolbar:
+			frame.config(bg=COLORS["bg_toolbar"])
+		for frame in self._themed_frames_primary:
+			frame.config(bg=COLORS["bg_primary"])
+		for label in self._themed_labels_toolbar:
+			label.config(bg=COLORS["bg_toolbar"], fg="white")
+		for entry in self._themed_entries:
+			entry.config(bg=COLORS["bg_secondary"], fg=COLORS["text_primary"],
+			            highlightbackground=COLORS["border"],
+			            highlightcolor=COLORS["accent_blue"],
+			            insertbackground=COLORS["text_primary"])
+
+		# Treeview tag'leri güncelle: tag_configure mevcut satırları canlı
+		# yeniden boyar, verileri DB'den yeniden yüklemeye gerek yok
 		self.tree.tag_configure("Düşük", background=COLORS["risk_low"])
 		self.tree.tag_configure("Riskli", background=COLORS["risk_medium"])
 		self.tree.tag_configure("Yüksek", background=COLORS["risk_high"])
-		
-		# Refresh ile verileri yeniden yükle
-		self.refresh()
-
-	def _update_widget_colors(self, widget):
-		"""Rekursif olarak widget renklerini güncelle"""
-		try:
-			if isinstance(widget, tk.Frame):
-				if hasattr(widget, 'cget'):
-					try:
-						bg = widget.cget('bg')
-						if bg in [THEMES["light"]["bg_toolbar"], THEMES["dark"]["bg_toolbar"], 
-						          THEMES["light"]["bg_primary"], THEMES["dark"]["bg_primary"],
-						          THEMES["light"]["bg_secondary"], THEMES["dark"]["bg_secondary"]]:
-							if "toolbar" in str(widget):
-								widget.config(bg=COLORS["bg_toolbar"])
-							elif "tree" in str(widget).lower() or "frame" in str(widget).lower():
-								widget.config(bg=COLORS["bg_primary"])
-							else:
-								widget.config(bg=COLORS["bg_secondary"])
-					except:
-						pass
-			elif isinstance(widget, tk.Label):
-				try:
-					bg = widget.cget('bg')
-					if bg in [THEMES["light"]["bg_toolbar"], THEMES["dark"]["bg_toolbar"]]:
-						widget.config(bg=COLORS["bg_toolbar"], fg="white")
-					elif bg in [THEMES["light"]["bg_primary"], THEMES["dark"]["bg_primary"]]:
-						widget.config(bg=COLORS["bg_primary"], fg=COLORS["text_primary"])
-					elif bg in [THEMES["light"]["bg_secondary"], THEMES["dark"]["bg_secondary"]]:
-						widget.config(bg=COLORS["bg_secondary"], fg=COLORS["text_primary"])
-				except:
-					pass
-			elif isinstance(widget, tk.Entry):
-				try:
-					widget.config(bg=COLORS["bg_secondary"], fg=COLORS["text_primary"],
-					            highlightbackground=COLORS["border"],
-					            highlightcolor=COLORS["accent_blue"],
-					            insertbackground=COLORS["text_primary"])
-				except:
-					pass
-			
-			# Alt widget'ları da güncelle
-			for child in widget.winfo_children():
-				self._update_widget_colors(child)
-		except:
-			pass
 
 	def _init_and_seed(self):
 		init_db(DB_PATH)
 		rows = list_companies(DB_PATH)
 		if not rows:
-			self._run_bg(self._seed_and_compute, "Veriler yükleniyor...")
+			self._run_bg(_seed_and_compute_job, "Veriler yükleniyor...", DB_PATH)
 		else:
 			self.refresh()
 
-	def _run_bg(self, func, busy_message: str):
+	def _run_bg(self, func, busy_message: str, *args):
+		"""
+		Bir işi süreç havuzunda başlatır. Tamamlanınca tek bir `after(0)`
+		ile UI thread'inde `_bg_done` çalışır; periyodik yoklama yapılmaz.
+		`func` picklanabilir (modül seviyesinde) olmalı.
+		"""
 		self.config(cursor="watch")
 		self.title(f"{busy_message} - Vergi Risk Analizi")
-		def wrapper():
-			try:
-				func()
-			except Exception as e:
-				self.after(0, lambda: messagebox.showerror("Hata", str(e)))
-			finally:
-				self.after(0, self._clear_busy)
-		threading.Thread(target=wrapper, daemon=True).start()
+		fut = _get_executor().submit(func, *args)
+		fut.add_done_callback(self._bg_finished)
+
+	def _bg_finished(self, fut):
+		# Havuz thread'inde çağrılır: hata varsa burada alınır,
+		# UI thread'ine tek bir olay gönderilir
+		self.after(0, self._bg_done, fut.exception())
+
+	def _bg_done(self, exc):
+		if exc is not None:
+			messagebox.showerror("Hata", str(exc))
+		self._clear_busy()
 
 	def _clear_busy(self):
 		self.config(cursor="")
 		self.title("Vergi Risk Analizi")
 		self.refresh()
 
-	def _seed_and_compute(self):
-		seed_database(DB_PATH, companies=1000)
-		compute_and_update_risk(DB_PATH)
-
 	def refresh(self):
 		q = (self.search_var.get() if hasattr(self, "search_var") else "").strip().lower()
-		for i in self.tree.get_children():
-			self.tree.delete(i)
-		for row in list_companies(DB_PATH):
-			cid, name, tax, revenue, expenses, risk_score, risk_level, created_at = row
-			if q:
-				if (q not in (name or "").lower()) and (q not in (tax or "").lower()):
-					continue
-			tag = risk_level if risk_level in ("Düşük", "Riskli", "Yüksek") else ""
-			self.tree.insert("", tk.END, values=(cid, name, tax, f"{revenue:,.2f}", f"{expenses:,.2f}", f"{risk_score:,.1f}", risk_level, created_at), tags=(tag,))
+		# Doldurma sırasında ağacı geometriden ayır: Tk her insert için layout tetiklemesin
+		self.tree.pack_forget()
+		try:
+			self.tree.delete(*self.tree.get_children())
+			# Tüm görüntü değerlerini ve tag'leri tek comprehension'da hazırla;
+			# insert döngüsü yalnızca Tk çağrısı yapar
+			rows = [
+				(
+					(cid, name, tax, f"{revenue:,.2f}", f"{expenses:,.2f}", f"{risk_score:,.1f}", risk_level, created_at),
+					risk_level if risk_level in ("Düşük", "Riskli", "Yüksek") else "",
+				)
+				for (cid, name, tax, revenue, expenses, risk_score, risk_level, created_at)
+				in list_companies(DB_PATH, search=q or None)
+			]
+			insert = self.tree.insert
+			for values, tag in rows:
+				insert("", tk.END, values=values, tags=(tag,))
+		finally:
+			self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, before=self.scroll_y)
+
+	def _on_search_enter(self, _event):
+		# Enter anında yeniler; bekleyen gecikmeli arama varsa iptal edilir
+		if self._search_after_id is not None:
+			self.after_cancel(self._search_after_id)
+			self._search_after_id = None
+		self.refresh()
+
+	def _on_search_typed(self, _event):
+		# Enter'ın KeyRelease'i ikinci bir gecikmeli refresh planlamasın;
+		# <Return> bağlaması zaten anında yeniledi
+		if _event.keysym == "Return":
+			return
+		if self._search_after_id is not None:
+			self.after_cancel(self._search_after_id)
+		self._search_after_id = self.after(250, self._do_debounced_search)
+
+	def _do_debounced_search(self):
+		self._search_after_id = None
+		self.refresh()
 
 	def clear_search(self):
 		if hasattr(self, "search_var"):
@@ -598,10 +676,10 @@ class App(tk.Tk):
 		self.refresh()
 
 	def seed_if_empty(self):
-		self._run_bg(self._seed_and_compute, "Seed çalışıyor...")
+		self._run_bg(_seed_and_compute_job, "Seed çalışıyor...", DB_PATH)
 
 	def compute_risk_async(self):
-		self._run_bg(lambda: compute_and_update_risk(DB_PATH), "Risk hesaplanıyor...")
+		self._run_bg(_compute_risk_job, "Risk hesaplanıyor...", DB_PATH)
 
 	def add_company_dialog(self):
 		dlg = AddCompanyDialog(self)
@@ -616,27 +694,28 @@ class App(tk.Tk):
 		self.refresh()
 
 	def _generate_documents_for_company(self, company_id: int):
-		rng = random.Random()
-		num_docs = rng.randint(50, 120)
-		revenue_total = 0.0
-		expenses_total = 0.0
+		rng = self._rng
+		n = int(rng.integers(50, 121))
 		invoice_avg = rng.uniform(5_000, 40_000)
 		receipt_avg = rng.uniform(500, 8_000)
 		under_rep = rng.uniform(0.05, 0.25)
-		for _ in range(num_docs):
-			is_invoice = rng.random() < 0.55
-			if is_invoice:
-				amount = max(50.0, rng.gauss(invoice_avg, invoice_avg * 0.35))
-				doc_type = "FATURA"
-				revenue_total += amount
-			else:
-				amount = max(20.0, rng.gauss(receipt_avg, receipt_avg * 0.45))
-				doc_type = "FIS"
-				expenses_total += amount
-			reported = rng.random() > under_rep
-			vendor = "Yeni Tedarikçi"
-			date_str = "2025-01-01"
-			add_document(company_id, doc_type, float(amount), reported, vendor, date_str, db_path=DB_PATH)
+		vendor = "Yeni Tedarikçi"
+		date_str = "2025-01-01"
+		# Tüm tutarları tek seferde vektörel olarak üret (belge başına Python döngüsü yok)
+		is_invoice = rng.random(n) < 0.55
+		amounts = np.where(
+			is_invoice,
+			np.maximum(50.0, rng.normal(invoice_avg, invoice_avg * 0.35, n)),
+			np.maximum(20.0, rng.normal(receipt_avg, receipt_avg * 0.45, n)),
+		)
+		reported = rng.random(n) > under_rep
+		revenue_total = float(amounts[is_invoice].sum())
+		expenses_total = float(amounts[~is_invoice].sum())
+		rows = [
+			("FATURA" if inv else "FIS", float(amt), bool(rep), vendor, date_str)
+			for inv, amt, rep in zip(is_invoice.tolist(), amounts.tolist(), reported.tolist())
+		]
+		add_documents_bulk(company_id, rows, db_path=DB_PATH)
 		update_company_totals(company_id, revenue_total, expenses_total, db_path=DB_PATH)
 
 	def delete_selected(self):
@@ -658,36 +737,25 @@ class App(tk.Tk):
 		if not companies:
 			messagebox.showinfo("Bilgi", "Silinecek şirket bulunmamaktadır.")
 			return
-		
-		# Çift onay iste
+
+		# Tek adımda yazılı onay: iki ardışık modal döngü yerine
+		# kullanıcıdan 'SIL' yazması istenir
 		count = len(companies)
-		msg = f"TÜM ŞİRKETLERİ SİLMEK İSTEDİĞİNİZE EMİN MİSİNİZ?\n\n"
-		msg += f"Bu işlem {count} şirketi ve tüm belgelerini kalıcı olarak silecektir.\n"
-		msg += f"Bu işlem geri alınamaz!\n\n"
-		msg += f"Devam etmek istiyor musunuz?"
-		
-		if not messagebox.askyesno("DİKKAT - Tüm Şirketleri Sil", msg, icon='warning'):
+		answer = simpledialog.askstring(
+			"DİKKAT - Tüm Şirketleri Sil",
+			f"Bu işlem {count} şirketi ve tüm belgelerini kalıcı olarak silecektir.\n"
+			f"Bu işlem geri alınamaz!\n\n"
+			f"Devam etmek için 'SIL' yazın:",
+			parent=self,
+		)
+		if answer is None:
 			return
-		
-		# Son bir kez daha onay iste
-		if not messagebox.askyesno("SON ONAY", 
-		                          "Bu işlem geri alınamaz!\n\n"
-		                          "Tüm şirketleri silmek istediğinize kesinlikle emin misiniz?",
-		                          icon='error'):
+		if answer.strip() != "SIL":
+			messagebox.showinfo("Bilgi", "Onay metni eşleşmedi, silme iptal edildi.")
 			return
-		
-		# Tüm şirketleri sil
-		self.config(cursor="watch")
-		try:
-			for company in companies:
-				cid = company[0]
-				delete_company(cid, DB_PATH)
-			messagebox.showinfo("Tamamlandı", f"Tüm şirketler ({count} adet) başarıyla silindi.")
-		except Exception as e:
-			messagebox.showerror("Hata", f"Şirketler silinirken bir hata oluştu:\n{str(e)}")
-		finally:
-			self.config(cursor="")
-			self.refresh()
+
+		# Silme işlemi arka planda çalışır, mainloop bloke olmaz
+		self._run_bg(db_delete_all_companies, "Tüm şirketler siliniyor...", DB_PATH)
 
 	def on_double_click_row(self, _event):
 		cur = self.tree.selection()
@@ -5,10 +5,12 @@ Makine öğrenmesi algoritmalarının test edilmesi için anomali içeren verile
 """
 
 import random
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Tuple
 
-from db import init_db, add_company, add_document, update_company_totals, get_connection
+import numpy as np
+
+from db import init_db, get_connection, add_documents
 
 
 # Tedarikçi firma isimleri listesi
@@ -47,30 +49,16 @@ def _gen_company_name(rng: random.Random) -> str:
 def _gen_tax_number(rng: random.Random) -> str:
 	"""
 	Rastgele vergi numarası oluşturur.
-	10 haneli rastgele sayı dizisi üretir.
-	
-	Args:
-		rng: Rastgele sayı üreteci
-		
-	Returns:
-		10 haneli vergi numarası string'i
-	"""
-	return "".join(str(rng.randint(0, 9)) for _ in range(10))
-
+	Tek bir 10^10 aralığında sayı çekip sıfır dolgulu formatlar;
+	hane başına ayrı RNG çağrısı ve join yapılmaz.
 
-def _gen_doc_date(rng: random.Random) -> str:
-	"""
-	Rastgele belge tarihi oluşturur.
-	Bugünden geriye doğru 0-365 gün arası rastgele bir tarih seçer.
-	
 	Args:
 		rng: Rastgele sayı üreteci
-		
+
 	Returns:
-		YYYY-MM-DD formatında tarih string'i
+		10 haneli vergi numarası string'i
 	"""
-	base = datetime.utcnow() - timedelta(days=rng.randint(0, 365))
-	return base.strftime("%Y-%m-%d")
+	return f"{rng.randrange(10_000_000_000):010d}"
 
 
 def _company_profile(rng: random.Random) -> Tuple[int, float, float]:
@@ -108,70 +96,228 @@ def seed_database(db_path: str = "app.db", companies: int = 1000, seed: int = 42
 	- Belge seviyesi: Normal dağılımdan sapmalar
 	- Bildirim: Bazı şirketlerde %5-35 arası bildirilmemiş belge oranı
 	
+	Tüm ekleme işlemleri tek transaction içinde yapılır: şirketler
+	cursor üzerinden, belgeler ve toplam güncellemeleri executemany ile
+	yazılır ve sonda tek commit atılır. Satır başına ayrı transaction
+	(ve fsync) olmadığı için 1000 şirketlik seed, add_* döngüsünden
+	katbekat hızlıdır.
+
 	Args:
 		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
 		companies: Oluşturulacak şirket sayısı (varsayılan: 1000)
 		seed: Rastgele sayı üreteci seed değeri (varsayılan: 42)
 	"""
 	rng = random.Random(seed)
-	
+	# Belge tutarları/maskeleri için blok RNG: değer başına Python çağrısı yerine
+	# şirket başına birkaç toplu ndarray üretimi
+	rng_np = np.random.default_rng(seed)
+
 	# Veritabanını başlat
 	init_db(db_path)
 	conn = get_connection(db_path)
-	conn.close()
-
-	# Her şirket için veri oluştur
-	for _ in range(companies):
-		# Şirket temel bilgilerini oluştur
-		name = _gen_company_name(rng)
-		tax = _gen_tax_number(rng)
-		num_docs, invoice_avg, receipt_avg = _company_profile(rng)
-
-		# Başlangıç toplamları sıfırla
-		revenue_total = 0.0
-		expenses_total = 0.0
-
-		# Şirketi veritabanına ekle (başlangıçta toplamlar 0)
-		company_id = add_company(name, tax, 0.0, 0.0, db_path=db_path)
-
-		# Şirket seviyesinde anomali simülasyonu: çarpanlar ile tutarları değiştir
-		# Bu, bazı şirketlerin normalden daha yüksek/düşük tutarlı belgeleri olmasını sağlar
-		invoice_multiplier = rng.uniform(0.5, 1.6)
-		receipt_multiplier = rng.uniform(0.5, 1.8)
-
-		# Bazı şirketlerde bildirilmemiş belge davranışı simüle et
-		# Yüksek olasılık = daha fazla bildirilmemiş belge
-		under_report_prob = rng.uniform(0.05, 0.35)
-
-		# Her şirket için belgeler oluştur
-		for _d in range(num_docs):
-			# %55 olasılıkla fatura, %45 olasılıkla fiş
-			is_invoice = rng.random() < 0.55
-			
-			if is_invoice:
-				# Fatura tutarı: normal dağılım kullanarak ortalama etrafında varyasyon
-				# Çarpan ile şirket seviyesinde anomali eklenir
-				amount = max(50.0, rng.gauss(invoice_avg * invoice_multiplier, invoice_avg * 0.35))
-				doc_type = "FATURA"
-				revenue_total += amount
-			else:
-				# Fiş tutarı: normal dağılım kullanarak ortalama etrafında varyasyon
-				amount = max(20.0, rng.gauss(receipt_avg * receipt_multiplier, receipt_avg * 0.45))
-				doc_type = "FIS"
-				expenses_total += amount
-
-			# Belgenin bildirilip bildirilmediğini rastgele belirle
-			reported = rng.random() > under_report_prob
-			
-			# Rastgele tedarikçi ve tarih seç
-			vendor = rng.choice(VENDORS)
-			date_str = _gen_doc_date(rng)
-			
-			# Belgeyi veritabanına ekle
-			add_document(company_id, doc_type, float(amount), reported, vendor, date_str, db_path=db_path)
-
-		# Şirketin toplam gelir ve giderlerini güncelle
-		update_company_totals(company_id, revenue_total, expenses_total, db_path=db_path)
+	cur = conn.cursor()
+
+	# Tüm belge satırları ve şirket toplamları bellekte toplanır,
+	# transaction sonunda topluca yazılır
+	doc_rows = []
+	totals = []
+	# Zaman damgaları döngü dışında bir kez hesaplanır:
+	# şirket başına syscall + format maliyeti yok
+	created_at = datetime.utcnow().isoformat()
+	date_base = np.datetime64(datetime.utcnow().date())
+	# Tedarikçi seçimi için object dizisi: indeks dizisiyle toplu lookup,
+	# belge başına rng.choice çağrısı yok
+	vendor_arr = np.array(VENDORS, dtype=object)
+	# Vergi no çakışması UNIQUE kısıtına takılıp tüm transaction'ı bozmasın
+	seen_tax = set()
+
+	try:
+		# Her şirket için veri oluştur
+		for _ in range(companies):
+			# Şirket temel bilgilerini oluştur
+			name = _gen_company_name(rng)
+			tax = _gen_tax_number(rng)
+			while tax in seen_tax:
+				tax = _gen_tax_number(rng)
+			seen_tax.add(tax)
+			num_docs, invoice_avg, receipt_avg = _company_profile(rng)
+
+			# Şirketi ekle (başlangıçta toplamlar 0); commit sona bırakılır
+			cur.execute(
+				"""
+				INSERT INTO companies(name, tax_number, revenue, expenses, created_at)
+				VALUES(?,?,?,?,?)
+				""",
+				(name, tax, 0.0, 0.0, created_at),
+			)
+			company_id = cur.lastrowid
+
+			# Şirket seviyesinde anomali simülasyonu: çarpanlar ile tutarları değiştir
+			# Bu, bazı şirketlerin normalden daha yüksek/düşük tutarlı belgeleri olmasını sağlar
+			invoice_multiplier = rng.uniform(0.5, 1.6)
+			receipt_multiplier = rng.uniform(0.5, 1.8)
+
+			# Bazı şirketlerde bildirilmemiş belge davranışı simüle et
+			# Yüksek olasılık = daha fazla bildirilmemiş belge
+			under_report_prob = rng.uniform(0.05, 0.35)
+
+			# Şirketin tüm belgelerini toplu üret:
+			# %55 olasılıkla fatura, %45 olasılıkla fiş; tutarlar normal
+			# dağılımdan (çarpanlar şirket seviyesinde anomali ekler)
+			is_invoice = rng_np.random(num_docs) < 0.55
+			amounts = np.where(
+				is_invoice,
+				np.maximum(50.0, rng_np.normal(invoice_avg * invoice_multiplier, invoice_avg * 0.35, num_docs)),
+				np.maximum(20.0, rng_np.normal(receipt_avg * receipt_multiplier, receipt_avg * 0.45, num_docs)),
+			)
+			reported = rng_np.random(num_docs) > under_report_prob
+
+			# Belge tarihleri: 0-365 gün geriye ofsetler tek seferde çekilir,
+			# YYYY-MM-DD string'lerine topluca çevrilir
+			offsets = rng_np.integers(0, 366, size=num_docs).astype("timedelta64[D]")
+			dates = (date_base - offsets).astype(str)
+
+			# Tedarikçiler: tek toplu indeks çekimi + dizi lookup'ı
+			vendors = vendor_arr[rng_np.integers(0, vendor_arr.shape[0], size=num_docs)]
+
+			# Toplamlar maskeli vektör toplamlarından
+			revenue_total = float(amounts[is_invoice].sum())
+			expenses_total = float(amounts[~is_invoice].sum())
+
+			for inv, amount, rep, date_str, vendor in zip(
+				is_invoice.tolist(), amounts.tolist(), reported.tolist(), dates.tolist(), vendors.tolist()
+			):
+				doc_rows.append((company_id, "FATURA" if inv else "FIS", float(amount), 1 if rep else 0, vendor, date_str))
+
+			totals.append((revenue_total, expenses_total, company_id))
+
+		# Toplamlar ve belgeler topluca yazılır; commit açıkça burada
+		# atılır, add_documents'ın aynı bağlantıda commit etmesine
+		# güvenilmez (temiz bağlantıda ikinci commit bedava)
+		cur.executemany(
+			"UPDATE companies SET revenue = ?, expenses = ? WHERE id = ?",
+			totals,
+		)
+		add_documents(doc_rows, db_path)
+		conn.commit()
+		# Sorgu planlayıcısına güncel istatistik ver
+		cur.execute("ANALYZE")
+	except Exception:
+		conn.rollback()
+		raise
+
+
+def seed_database_sql(db_path: str = "app.db", companies: int = 1000) -> None:
+	"""
+	Veritabanını tamamen SQLite içinde üretilen sentetik verilerle doldurur.
+
+	Satırlar recursive CTE + random() ile motor tarafında üretilir; Python
+	ile SQLite arasında satır başına sınır geçişi olmadığı için Python
+	tabanlı seed_database'den çok daha hızlıdır. Dağılımlar yaklaşıktır
+	(normal yerine düzgün dağılım) ve seed ile tekrarlanabilir DEĞİLDİR;
+	birebir aynı veri gerekiyorsa seed_database kullanılmalıdır.
+
+	Args:
+		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
+		companies: Oluşturulacak şirket sayısı (varsayılan: 1000, en çok 10000)
+
+	Raises:
+		ValueError: companies 10000'i aşarsa. Vergi numarasının son 4 hanesi
+			sıra numarasından gelir; üzerinde sonek tekrarlanır ve rastgele
+			önek çakışması UNIQUE kısıtıyla tüm seed'i düşürebilir.
+	"""
+	if companies > 10000:
+		raise ValueError("companies en çok 10000 olabilir (vergi no soneki 4 hanelidir)")
+	init_db(db_path)
+	conn = get_connection(db_path)
+	cur = conn.cursor()
+
+	# Sabit listeleri SQL VALUES biçimine çevir (indeksli seçim için)
+	prefix_values = ",".join(f"({i},'{p}')" for i, p in enumerate(COMPANY_PREFIX))
+	suffix_values = ",".join(f"({i},'{s}')" for i, s in enumerate(COMPANY_SUFFIX))
+	vendor_values = ",".join(f"({i},'{v}')" for i, v in enumerate(VENDORS))
+	now_iso = datetime.utcnow().isoformat()
+
+	try:
+		# Şirketler: vergi no'ya sıra numarası gömülür, toplu üretimde çakışma olmaz
+		cur.execute(
+			f"""
+			WITH RECURSIVE seq(n) AS (
+				SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < ?
+			),
+			prefixes(i, p) AS (VALUES {prefix_values}),
+			suffixes(i, s) AS (VALUES {suffix_values}),
+			-- Rastgele indeksler burada sabitlenir (MATERIALIZED):
+			-- join sırasında random() yeniden değerlendirilmez
+			picks AS MATERIALIZED (
+				SELECT n,
+				       abs(random()) % {len(COMPANY_PREFIX)} AS pi,
+				       abs(random()) % {len(COMPANY_SUFFIX)} AS si
+				FROM seq
+			)
+			INSERT INTO companies(name, tax_number, revenue, expenses, created_at)
+			SELECT
+				p.p || ' ' || s.s || ' A.Ş.',
+				printf('%06d%04d', abs(random()) % 1000000, picks.n % 10000),
+				0, 0, ?
+			FROM picks
+			JOIN prefixes p ON p.i = picks.pi
+			JOIN suffixes s ON s.i = picks.si
+			""",
+			(companies, now_iso),
+		)
+
+		# Belgeler: şirket başına 20-200 satır, tür/tutar/beyan/tarih motor içinde
+		cur.execute(
+			f"""
+			WITH RECURSIVE seq(n) AS (
+				SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < 200
+			),
+			-- MATERIALIZED şart: aksi halde satırdan bağımsız random() ifadesi
+			-- join'e katlanıp tek kez değerlendirilir ve her şirket aynı
+			-- sayıda belge alır
+			counts AS MATERIALIZED (
+				SELECT id AS company_id, 20 + abs(random()) % 181 AS num_docs
+				FROM companies
+			),
+			vendors(i, v) AS (VALUES {vendor_values}),
+			rows AS MATERIALIZED (
+				SELECT c.company_id,
+				       (abs(random()) % 100 < 55) AS is_invoice,
+				       abs(random()) % {len(VENDORS)} AS vi
+				FROM counts c JOIN seq s ON s.n <= c.num_docs
+			)
+			INSERT INTO documents(company_id, doc_type, amount, reported, vendor, date)
+			SELECT
+				rows.company_id,
+				CASE WHEN is_invoice THEN 'FATURA' ELSE 'FIS' END,
+				CASE WHEN is_invoice
+					THEN 50.0 + (abs(random()) % 5000000) / 100.0
+					ELSE 20.0 + (abs(random()) % 1600000) / 100.0
+				END,
+				CASE WHEN abs(random()) % 100 < 80 THEN 1 ELSE 0 END,
+				vnd.v,
+				date('now', '-' || (abs(random()) % 366) || ' days')
+			FROM rows JOIN vendors vnd ON vnd.i = rows.vi
+			""",
+		)
+
+		# Toplamları belgelerden hesapla
+		cur.execute(
+			"""
+			UPDATE companies SET
+				revenue = COALESCE((SELECT SUM(amount) FROM documents d
+					WHERE d.company_id = companies.id AND d.doc_type = 'FATURA'), 0),
+				expenses = COALESCE((SELECT SUM(amount) FROM documents d
+					WHERE d.company_id = companies.id AND d.doc_type = 'FIS'), 0)
+			"""
+		)
+		conn.commit()
+		# Sorgu planlayıcısına güncel istatistik ver
+		cur.execute("ANALYZE")
+	except Exception:
+		conn.rollback()
+		raise
 
 
 if __name__ == "__main__":
@@ -3,7 +3,9 @@ Veritabanı işlemleri modülü.
 SQLite veritabanı üzerinde şirket ve belge verilerinin yönetimi için fonksiyonlar içerir.
 """
 
+import os
 import sqlite3
+import threading
 from pathlib import Path
 from typing import List, Optional, Tuple
 from datetime import datetime
@@ -11,12 +13,73 @@ from datetime import datetime
 # Varsayılan veritabanı dosya adı
 DB_FILE = "app.db"
 
+# (db_path, thread id) başına kalıcı bağlantı: her yardımcı fonksiyon
+# çağrısında yeniden bağlanma (dosya açma + PRAGMA tekrarı) maliyeti
+# ödenmez ve her thread kendi bağlantısını kullandığı için kilitlenme olmaz.
+_conn_lock = threading.Lock()
+_conn_cache: dict = {}
+
+# Sık kullanılan SQL metinleri modül seviyesinde sabittir: aynı string
+# nesnesi aynı bağlantıya verildiğinde sqlite3'ün derlenmiş ifade
+# önbelleği (cached_statements) isabet eder ve parse/plan maliyeti
+# yalnızca ilk çağrıda ödenir.
+_SQL_INSERT_COMPANY = """
+	INSERT INTO companies(name, tax_number, revenue, expenses, created_at)
+	VALUES(?,?,?,?,?)
+	"""
+
+_SQL_INSERT_DOC = """
+	INSERT INTO documents(company_id, doc_type, amount, reported, vendor, date)
+	VALUES(?,?,?,?,?,?)
+	"""
+
+_SQL_SELECT_COMPANIES = """
+	SELECT id, name, tax_number, revenue, expenses, risk_score, risk_level, created_at
+	FROM companies
+	"""
+
+_SQL_SELECT_COMPANY = _SQL_SELECT_COMPANIES + " WHERE id = ?"
+
+_SQL_SELECT_DOCUMENTS = """
+	SELECT id, doc_type, amount, reported, vendor, date, suspicious
+	FROM documents
+	WHERE company_id = ?
+	ORDER BY date ASC, id ASC
+	"""
+
+_SQL_DELETE_COMPANY = "DELETE FROM companies WHERE id = ?"
+
+_SQL_UPDATE_TOTALS = "UPDATE companies SET revenue = ?, expenses = ? WHERE id = ?"
+
+_SQL_UPDATE_RISK = "UPDATE companies SET risk_score = ?, risk_level = ? WHERE id = ?"
+
+_SQL_UPDATE_SUSPICIOUS = "UPDATE documents SET suspicious = ? WHERE id = ?"
+
+_SQL_UPDATE_REPORTED = "UPDATE documents SET reported = ? WHERE id = ?"
+
+
+def _py_lower(value):
+	"""
+	SQL'e kaydedilen Unicode-duyarlı küçük harf fonksiyonu.
+
+	SQLite'ın yerleşik lower() fonksiyonu yalnızca ASCII harfleri katlar;
+	"A.Ş." veya "İnşaat" gibi Türkçe karakter içeren adlar için arama
+	filtreleri Python'ın str.lower()'ını kullanmalıdır.
+
+	Args:
+		value: Küçük harfe çevrilecek değer (string olmayanlar aynen döner)
+
+	Returns:
+		Küçük harfe çevrilmiş string (veya değer string değilse kendisi)
+	"""
+	return value.lower() if isinstance(value, str) else value
+
 
 def _enable_foreign_keys(conn: sqlite3.Connection) -> None:
 	"""
 	SQLite bağlantısında yabancı anahtar kısıtlamalarını etkinleştirir.
 	Bu sayede referans bütünlüğü korunur (ör: şirket silindiğinde belgeleri de silinir).
-	
+
 	Args:
 		conn: SQLite veritabanı bağlantısı
 	"""
@@ -25,171 +88,243 @@ def _enable_foreign_keys(conn: sqlite3.Connection) -> None:
 
 def get_connection(db_path: str = DB_FILE) -> sqlite3.Connection:
 	"""
-	Veritabanı bağlantısı oluşturur ve yabancı anahtarları etkinleştirir.
-	
+	Çağıran thread'e ait kalıcı veritabanı bağlantısını döndürür.
+
+	Bağlantılar (db_path, thread id) anahtarıyla önbelleğe alınır: her
+	thread ilk çağrısında kendi bağlantısını oluşturur, sonraki çağrılar
+	aynı nesneyi alır. Çağıran kod bağlantıyı KAPATMAMALIDIR (kapatmak
+	için close_all). WAL modu sayesinde farklı thread'lerin okuyucuları
+	ve yazıcıları birbirini bloke etmez.
+
 	Args:
 		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
-		
+
 	Returns:
-		SQLite veritabanı bağlantı nesnesi
+		SQLite veritabanı bağlantı nesnesi (thread'e özel, önbellekli)
+	"""
+	key = (db_path, threading.get_ident())
+	with _conn_lock:
+		conn = _conn_cache.get(key)
+		if conn is None:
+			# cached_statements=256: tüm yardımcı fonksiyonların SQL'i
+			# derlenmiş halde önbellekte kalır (varsayılan 128)
+			conn = sqlite3.connect(db_path, cached_statements=256)
+			_enable_foreign_keys(conn)
+			# WAL + NORMAL: okuyucular yazıcıyı beklemez, commit başına tek fsync
+			conn.execute("PRAGMA journal_mode=WAL;")
+			conn.execute("PRAGMA synchronous=NORMAL;")
+			# Geçici tablolar/indeksler RAM'de, 64 MB sayfa önbelleği,
+			# 256 MB mmap ile okuma yolunda kopya sayısı azalır
+			conn.execute("PRAGMA temp_store=MEMORY;")
+			conn.execute("PRAGMA cache_size=-65536;")
+			conn.execute("PRAGMA mmap_size=268435456;")
+			# Türkçe karakterler için Unicode-duyarlı lower (arama filtreleri)
+			conn.create_function("py_lower", 1, _py_lower, deterministic=True)
+			_conn_cache[key] = conn
+		return conn
+
+
+def _reset_after_fork() -> None:
+	"""
+	fork sonrası alt süreçte bağlantı önbelleğini sıfırlar.
+
+	fork ile başlayan süreç havuzu işçileri ebeveynin _conn_cache'ini ve
+	thread kimliğini devralır; get_connection bu durumda ebeveynin canlı
+	bağlantı nesnesini döndürür. Açık bir SQLite bağlantısını fork
+	üzerinden taşımak tanımsız davranıştır ve WAL kilitlerini bozabilir.
+	Önbellek KAPATMADAN temizlenir: close çağırmak ebeveynin kilitlerini
+	serbest bırakırdı. Kilit de tazelenir (fork anında tutuluyor olabilir).
+	"""
+	global _conn_lock
+	_conn_lock = threading.Lock()
+	_conn_cache.clear()
+
+
+if hasattr(os, "register_at_fork"):
+	os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def close_all() -> None:
+	"""
+	Önbellekteki tüm veritabanı bağlantılarını kapatır.
+	Uygulama kapanışında veya testlerde dosya değiştirmeden önce kullanılır.
 	"""
-	conn = sqlite3.connect(db_path)
-	_enable_foreign_keys(conn)
-	return conn
+	with _conn_lock:
+		for conn in _conn_cache.values():
+			try:
+				conn.close()
+			except sqlite3.Error:
+				pass
+		_conn_cache.clear()
 
 
 def init_db(db_path: str = DB_FILE) -> None:
 	"""
 	Veritabanını başlatır ve gerekli tabloları oluşturur.
-	
+
 	Oluşturulan tablolar:
 	- companies: Şirket bilgileri (isim, vergi no, gelir, gider, risk skoru)
 	- documents: Belge bilgileri (fatura/fiş, tutar, bildirim durumu, şüpheli işareti)
-	
+
 	Eğer tablolar zaten varsa, hiçbir şey yapmaz (IF NOT EXISTS).
-	
+
 	Args:
 		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
 	"""
 	# Veritabanı dosyasının bulunduğu dizini oluştur (yoksa)
 	Path(db_path).parent.mkdir(parents=True, exist_ok=True)
 	conn = get_connection(db_path)
-	try:
-		conn.executescript(
-			"""
-			-- Şirketler tablosu
-			CREATE TABLE IF NOT EXISTS companies (
-				id INTEGER PRIMARY KEY AUTOINCREMENT,
-				name TEXT NOT NULL,
-				tax_number TEXT NOT NULL UNIQUE,
-				revenue REAL NOT NULL DEFAULT 0,
-				expenses REAL NOT NULL DEFAULT 0,
-				risk_score REAL NOT NULL DEFAULT 0,
-				risk_level TEXT NOT NULL DEFAULT 'Düşük',
-				created_at TEXT NOT NULL
-			);
-
-			-- Belgeler tablosu
-			CREATE TABLE IF NOT EXISTS documents (
-				id INTEGER PRIMARY KEY AUTOINCREMENT,
-				company_id INTEGER NOT NULL,
-				doc_type TEXT NOT NULL CHECK (doc_type IN ('FATURA','FIS')),
-				amount REAL NOT NULL,
-				reported INTEGER NOT NULL CHECK (reported IN (0,1)),
-				vendor TEXT,
-				date TEXT NOT NULL,
-				suspicious INTEGER NOT NULL DEFAULT 0 CHECK (suspicious IN (0,1)),
-				FOREIGN KEY(company_id) REFERENCES companies(id) ON DELETE CASCADE
-			);
-			"""
-		)
-		conn.commit()
-	finally:
-		conn.close()
+	conn.executescript(
+		"""
+		-- Şirketler tablosu
+		CREATE TABLE IF NOT EXISTS companies (
+			id INTEGER PRIMARY KEY AUTOINCREMENT,
+			name TEXT NOT NULL,
+			tax_number TEXT NOT NULL UNIQUE,
+			revenue REAL NOT NULL DEFAULT 0,
+			expenses REAL NOT NULL DEFAULT 0,
+			risk_score REAL NOT NULL DEFAULT 0,
+			risk_level TEXT NOT NULL DEFAULT 'Düşük',
+			created_at TEXT NOT NULL
+		);
+
+		-- Belgeler tablosu
+		CREATE TABLE IF NOT EXISTS documents (
+			id INTEGER PRIMARY KEY AUTOINCREMENT,
+			company_id INTEGER NOT NULL,
+			doc_type TEXT NOT NULL CHECK (doc_type IN ('FATURA','FIS')),
+			amount REAL NOT NULL,
+			reported INTEGER NOT NULL CHECK (reported IN (0,1)),
+			vendor TEXT,
+			date TEXT NOT NULL,
+			suspicious INTEGER NOT NULL DEFAULT 0 CHECK (suspicious IN (0,1)),
+			FOREIGN KEY(company_id) REFERENCES companies(id) ON DELETE CASCADE
+		);
+
+		-- Ad araması baştan joker (%...%) py_lower(name) LIKE kullanır;
+		-- NOCASE indeksi bu sorguya hizmet edemediği için kaldırıldı
+		DROP INDEX IF EXISTS idx_companies_name;
+
+		-- Belge sorguları hep company_id ile filtreler; indeks olmadan
+		-- her list_documents çağrısı tüm tabloyu tarar
+		CREATE INDEX IF NOT EXISTS idx_documents_company ON documents(company_id);
+
+		-- Özellik çıkarımındaki GROUP BY/SUM sorgusu için örtücü indeks
+		-- (sorgu yalnızca indeksten cevaplanabilir)
+		CREATE INDEX IF NOT EXISTS idx_documents_company_type_amount ON documents(company_id, doc_type, amount);
+
+		-- İleride tarih aralığı sorguları için
+		CREATE INDEX IF NOT EXISTS idx_documents_date ON documents(date);
+		"""
+	)
+	conn.commit()
 
 
 def add_company(name: str, tax_number: str, revenue: float, expenses: float, db_path: str = DB_FILE) -> int:
 	"""
 	Yeni bir şirket ekler.
-	
+
 	Args:
 		name: Şirket adı
 		tax_number: Vergi numarası (benzersiz olmalı)
 		revenue: Toplam gelir
 		expenses: Toplam gider
 		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
-		
+
 	Returns:
 		Oluşturulan şirketin ID'si
 	"""
 	conn = get_connection(db_path)
-	try:
-		cur = conn.cursor()
-		cur.execute(
-			"""
-			INSERT INTO companies(name, tax_number, revenue, expenses, created_at)
-			VALUES(?,?,?,?,?)
-			""",
-			(name, tax_number, float(revenue), float(expenses), datetime.utcnow().isoformat()),
-		)
-		conn.commit()
-		return cur.lastrowid
-	finally:
-		conn.close()
+	cur = conn.cursor()
+	cur.execute(
+		_SQL_INSERT_COMPANY,
+		(name, tax_number, float(revenue), float(expenses), datetime.utcnow().isoformat()),
+	)
+	conn.commit()
+	return cur.lastrowid
 
 
 def delete_company(company_id: int, db_path: str = DB_FILE) -> None:
 	"""
 	Bir şirketi ve ona ait tüm belgeleri siler.
-	
+
 	Yabancı anahtar kısıtlaması sayesinde (ON DELETE CASCADE),
 	şirket silindiğinde otomatik olarak tüm belgeleri de silinir.
-	
+
 	Args:
 		company_id: Silinecek şirketin ID'si
 		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
 	"""
 	conn = get_connection(db_path)
-	try:
-		conn.execute("DELETE FROM companies WHERE id = ?", (company_id,))
-		conn.commit()
-	finally:
-		conn.close()
+	conn.execute(_SQL_DELETE_COMPANY, (company_id,))
+	conn.commit()
+
+
+def delete_all_companies(db_path: str = DB_FILE) -> None:
+	"""
+	Tüm şirketleri ve tüm belgeleri tek transaction içinde siler.
+
+	Şirket başına ayrı DELETE + commit yapmak yerine iki toplu DELETE
+	tek commit ile çalışır; 1000+ şirkette saniyeler yerine milisaniyeler sürer.
+
+	Args:
+		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
+	"""
+	conn = get_connection(db_path)
+	cur = conn.cursor()
+	cur.execute("DELETE FROM documents")
+	cur.execute("DELETE FROM companies")
+	conn.commit()
 
 
-def list_companies(db_path: str = DB_FILE) -> List[Tuple]:
+def list_companies(db_path: str = DB_FILE, search: Optional[str] = None) -> List[Tuple]:
 	"""
-	Tüm şirketleri listeler.
-	
+	Tüm şirketleri listeler. İsteğe bağlı olarak isim/vergi no araması yapar.
+
+	Arama filtresi SQL tarafında uygulanır; eşleşmeyen satırlar Python'a
+	hiç taşınmaz.
+
 	Args:
 		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
-		
+		search: Arama metni (opsiyonel). Verilirse şirket adı veya vergi
+			numarası içinde geçen satırlar döner (büyük/küçük harf duyarsız).
+
 	Returns:
 		Şirket bilgilerini içeren tuple listesi:
 		(id, name, tax_number, revenue, expenses, risk_score, risk_level, created_at)
 		ID'ye göre artan sırada sıralanır.
 	"""
 	conn = get_connection(db_path)
-	try:
-		cur = conn.cursor()
-		cur.execute(
-			"""
-			SELECT id, name, tax_number, revenue, expenses, risk_score, risk_level, created_at
-			FROM companies
-			ORDER BY id ASC
-			"""
-		)
-		return cur.fetchall()
-	finally:
-		conn.close()
+	cur = conn.cursor()
+	sql = _SQL_SELECT_COMPANIES
+	params: Tuple = ()
+	if search:
+		# py_lower: SQLite lower() ASCII dışını katlamaz (bkz. _py_lower)
+		sql += " WHERE py_lower(name) LIKE ? OR tax_number LIKE ? "
+		pattern = f"%{search.lower()}%"
+		params = (pattern, pattern)
+	sql += " ORDER BY id ASC"
+	cur.execute(sql, params)
+	return cur.fetchall()
 
 
 def get_company(company_id: int, db_path: str = DB_FILE) -> Optional[Tuple]:
 	"""
 	Belirli bir şirketin bilgilerini getirir.
-	
+
 	Args:
 		company_id: Şirket ID'si
 		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
-		
+
 	Returns:
 		Şirket bilgilerini içeren tuple:
 		(id, name, tax_number, revenue, expenses, risk_score, risk_level, created_at)
 		Eğer şirket bulunamazsa None döner.
 	"""
 	conn = get_connection(db_path)
-	try:
-		cur = conn.cursor()
-		cur.execute(
-			"""
-			SELECT id, name, tax_number, revenue, expenses, risk_score, risk_level, created_at
-			FROM companies WHERE id = ?
-			""",
-			(company_id,),
-		)
-		return cur.fetchone()
-	finally:
-		conn.close()
+	cur = conn.cursor()
+	cur.execute(_SQL_SELECT_COMPANY, (company_id,))
+	return cur.fetchone()
 
 
 def add_document(
@@ -203,7 +338,7 @@ def add_document(
 ) -> int:
 	"""
 	Yeni bir belge ekler (fatura veya fiş).
-	
+
 	Args:
 		company_id: Belgenin ait olduğu şirket ID'si
 		doc_type: Belge tipi ("FATURA" veya "FIS")
@@ -212,60 +347,107 @@ def add_document(
 		vendor: Tedarikçi firma adı (opsiyonel)
 		date_str: Belge tarihi (YYYY-MM-DD formatında)
 		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
-		
+
 	Returns:
 		Oluşturulan belgenin ID'si
 	"""
 	conn = get_connection(db_path)
-	try:
-		cur = conn.cursor()
-		cur.execute(
-			"""
-			INSERT INTO documents(company_id, doc_type, amount, reported, vendor, date)
-			VALUES(?,?,?,?,?,?)
-			""",
-			(company_id, doc_type, float(amount), 1 if reported else 0, vendor, date_str),
-		)
-		conn.commit()
-		return cur.lastrowid
-	finally:
-		conn.close()
+	cur = conn.cursor()
+	cur.execute(
+		_SQL_INSERT_DOC,
+		(company_id, doc_type, float(amount), 1 if reported else 0, vendor, date_str),
+	)
+	conn.commit()
+	return cur.lastrowid
+
+
+def add_documents(rows: List[Tuple], db_path: str = DB_FILE) -> int:
+	"""
+	Birden fazla belgeyi tek transaction içinde ekler.
+
+	Satırlar farklı şirketlere ait olabilir; tamamı tek executemany
+	çağrısıyla yazılır ve tek commit atılır. Seed ve toplu içe aktarma
+	gibi çok satırlı yazma yollarının ortak giriş noktasıdır; belge
+	başına add_document döngüsünden çok daha hızlıdır.
+
+	Args:
+		rows: (company_id, doc_type, amount, reported, vendor, date_str) tuple listesi
+			- company_id: Belgenin ait olduğu şirket ID'si
+			- doc_type: "FATURA" veya "FIS"
+			- amount: Belge tutarı
+			- reported: Bildirim durumu (True/False)
+			- vendor: Tedarikçi firma adı (opsiyonel)
+			- date_str: Belge tarihi (YYYY-MM-DD formatında)
+		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
+
+	Returns:
+		Eklenen belge sayısı
+	"""
+	conn = get_connection(db_path)
+	cur = conn.cursor()
+	cur.executemany(
+		_SQL_INSERT_DOC,
+		[
+			(company_id, doc_type, float(amount), 1 if reported else 0, vendor, date_str)
+			for (company_id, doc_type, amount, reported, vendor, date_str) in rows
+		],
+	)
+	conn.commit()
+	return cur.rowcount
+
+
+def add_documents_bulk(company_id: int, rows: List[Tuple], db_path: str = DB_FILE) -> int:
+	"""
+	Bir şirkete ait birden fazla belgeyi tek seferde ekler.
+
+	add_documents üzerine ince bir sarmalayıcıdır: tüm satırlara aynı
+	şirket ID'sini ekleyip tek transaction içinde yazar.
+
+	Args:
+		company_id: Belgelerin ait olduğu şirket ID'si
+		rows: (doc_type, amount, reported, vendor, date_str) tuple listesi
+			- doc_type: "FATURA" veya "FIS"
+			- amount: Belge tutarı
+			- reported: Bildirim durumu (True/False)
+			- vendor: Tedarikçi firma adı (opsiyonel)
+			- date_str: Belge tarihi (YYYY-MM-DD formatında)
+		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
+
+	Returns:
+		Eklenen belge sayısı
+	"""
+	return add_documents(
+		[
+			(company_id, doc_type, amount, reported, vendor, date_str)
+			for (doc_type, amount, reported, vendor, date_str) in rows
+		],
+		db_path,
+	)
 
 
 def list_documents(company_id: int, db_path: str = DB_FILE) -> List[Tuple]:
 	"""
 	Belirli bir şirkete ait tüm belgeleri listeler.
-	
+
 	Args:
 		company_id: Şirket ID'si
 		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
-		
+
 	Returns:
 		Belge bilgilerini içeren tuple listesi:
 		(id, doc_type, amount, reported, vendor, date, suspicious)
 		Tarihe göre artan, sonra ID'ye göre artan sırada sıralanır.
 	"""
 	conn = get_connection(db_path)
-	try:
-		cur = conn.cursor()
-		cur.execute(
-			"""
-			SELECT id, doc_type, amount, reported, vendor, date, suspicious
-			FROM documents
-			WHERE company_id = ?
-			ORDER BY date ASC, id ASC
-			""",
-			(company_id,),
-		)
-		return cur.fetchall()
-	finally:
-		conn.close()
+	cur = conn.cursor()
+	cur.execute(_SQL_SELECT_DOCUMENTS, (company_id,))
+	return cur.fetchall()
 
 
 def update_company_totals(company_id: int, revenue: float, expenses: float, db_path: str = DB_FILE) -> None:
 	"""
 	Şirketin toplam gelir ve gider tutarlarını günceller.
-	
+
 	Args:
 		company_id: Güncellenecek şirket ID'si
 		revenue: Yeni toplam gelir tutarı
@@ -273,22 +455,16 @@ def update_company_totals(company_id: int, revenue: float, expenses: float, db_p
 		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
 	"""
 	conn = get_connection(db_path)
-	try:
-		conn.execute(
-			"UPDATE companies SET revenue = ?, expenses = ? WHERE id = ?",
-			(float(revenue), float(expenses), company_id),
-		)
-		conn.commit()
-	finally:
-		conn.close()
+	conn.execute(_SQL_UPDATE_TOTALS, (float(revenue), float(expenses), company_id))
+	conn.commit()
 
 
 def update_company_risk(company_id: int, risk_score: float, risk_level: str, db_path: str = DB_FILE) -> None:
 	"""
 	Şirketin risk skoru ve risk seviyesini günceller.
-	
+
 	Makine öğrenmesi algoritması tarafından hesaplanan risk değerlerini kaydeder.
-	
+
 	Args:
 		company_id: Güncellenecek şirket ID'si
 		risk_score: Risk skoru (0-100 arası)
@@ -296,57 +472,39 @@ def update_company_risk(company_id: int, risk_score: float, risk_level: str, db_
 		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
 	"""
 	conn = get_connection(db_path)
-	try:
-		conn.execute(
-			"UPDATE companies SET risk_score = ?, risk_level = ? WHERE id = ?",
-			(float(risk_score), risk_level, company_id),
-		)
-		conn.commit()
-	finally:
-		conn.close()
+	conn.execute(_SQL_UPDATE_RISK, (float(risk_score), risk_level, company_id))
+	conn.commit()
 
 
 def mark_document_suspicious(doc_id: int, suspicious: bool, db_path: str = DB_FILE) -> None:
 	"""
 	Belgenin şüpheli olup olmadığını işaretler.
-	
+
 	Makine öğrenmesi algoritması tarafından anomali tespiti yapılan belgeler
 	şüpheli olarak işaretlenir.
-	
+
 	Args:
 		doc_id: İşaretlenecek belge ID'si
 		suspicious: Şüpheli durumu (True/False)
 		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
 	"""
 	conn = get_connection(db_path)
-	try:
-		conn.execute(
-			"UPDATE documents SET suspicious = ? WHERE id = ?",
-			(1 if suspicious else 0, doc_id),
-		)
-		conn.commit()
-	finally:
-		conn.close()
+	conn.execute(_SQL_UPDATE_SUSPICIOUS, (1 if suspicious else 0, doc_id))
+	conn.commit()
 
 
 def update_document_reported(doc_id: int, reported: bool, db_path: str = DB_FILE) -> None:
 	"""
 	Belgenin bildirilip bildirilmediğini günceller.
-	
+
 	Kullanıcı bir belgeyi bildirildi/bildirilmedi olarak işaretlediğinde
 	bu fonksiyon kullanılır.
-	
+
 	Args:
 		doc_id: Güncellenecek belge ID'si
 		reported: Bildirim durumu (True/False)
 		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
 	"""
 	conn = get_connection(db_path)
-	try:
-		conn.execute(
-			"UPDATE documents SET reported = ? WHERE id = ?",
-			(1 if reported else 0, doc_id),
-		)
-		conn.commit()
-	finally:
-		conn.close()
+	conn.execute(_SQL_UPDATE_REPORTED, (1 if reported else 0, doc_id))
+	conn.commit()
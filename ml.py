@@ -3,18 +3,21 @@ Makine öğrenmesi tabanlı risk analizi modülü.
 Şirketlerin ve belgelerin anomali tespiti için Isolation Forest algoritması kullanır.
 """
 
-from typing import List, Tuple
-import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+import os
 
+import numpy as np
 import pandas as pd
 from sklearn.ensemble import IsolationForest
 
-from db import (
-	list_companies,
-	list_documents,
-	update_company_risk,
-	mark_document_suspicious,
-)
+try:
+	# Opsiyonel hızlandırıcı: kuruluysa skor çekirdeği makine koduna derlenir
+	from numba import njit
+except ImportError:
+	njit = None
+
+from db import get_connection
 
 
 def _safe_div(a: float, b: float) -> float:
@@ -31,10 +34,10 @@ def _safe_div(a: float, b: float) -> float:
 	return a / b if b != 0 else 0.0
 
 
-def _company_features(db_path: str) -> pd.DataFrame:
+def _company_features(db_path: str, company_ids: Optional[List[int]] = None) -> pd.DataFrame:
 	"""
 	Veritabanından şirket verilerini çekip makine öğrenmesi için özellik vektörlerine dönüştürür.
-	
+
 	Her şirket için şu özellikler hesaplanır:
 	- revenue: Toplam gelir
 	- expenses: Toplam gider
@@ -44,93 +47,261 @@ def _company_features(db_path: str) -> pd.DataFrame:
 	- profit_margin: Kar marjı (gelir - gider) / gelir
 	- reported_ratio: Bildirilen belgelerin oranı
 	
+	Tüm toplamlar tek bir GROUP BY sorgusuyla SQLite içinde hesaplanır;
+	şirket başına ayrı list_documents çağrısı (N+1 sorgu) ve belge
+	satırlarının Python'a taşınması yoktur. Oranlar DataFrame üzerinde
+	vektörel olarak türetilir.
+
 	Args:
 		db_path: Veritabanı dosya yolu
-		
+		company_ids: Hesaplanacak şirket ID'leri (opsiyonel; None = tümü)
+
 	Returns:
 		Şirket özelliklerini içeren pandas DataFrame
 	"""
-	rows: List[Tuple] = list_companies(db_path)
-	features = []
-	for (cid, name, tax, revenue, expenses, risk_score, risk_level, created_at) in rows:
-		# Şirkete ait tüm belgeleri getir
-		docs = list_documents(cid, db_path)
-		num_docs = len(docs)
-		
-		# Fatura ve fiş tutarlarını ayrı ayrı hesapla
-		invoice_amt = sum(d[2] for d in docs if d[1] == "FATURA")
-		receipt_amt = sum(d[2] for d in docs if d[1] == "FIS")
-		
-		# Bildirilen belge sayısını say
-		reported_count = sum(1 for d in docs if int(d[3]) == 1)
-		
-		# Ortalama belge tutarını hesapla
-		avg_amount = _safe_div(sum(d[2] for d in docs), max(1, num_docs))
-		
-		# Fatura oranını hesapla (fatura tutarı / toplam belge tutarı)
-		invoice_ratio = _safe_div(invoice_amt, invoice_amt + receipt_amt)
-		
-		# Kar marjını hesapla
-		profit_margin = _safe_div((revenue - expenses), max(1.0, revenue))
-		
-		# Bildirilen belge oranını hesapla
-		reported_ratio = _safe_div(reported_count, max(1, num_docs))
+	conn = get_connection(db_path)
+	sql = """
+		SELECT c.id,
+		       c.revenue,
+		       c.expenses,
+		       COUNT(d.id) AS num_docs,
+		       COALESCE(SUM(d.amount), 0) AS total_amount,
+		       COALESCE(SUM(CASE WHEN d.doc_type = 'FATURA' THEN d.amount ELSE 0 END), 0) AS invoice_amt,
+		       COALESCE(SUM(CASE WHEN d.doc_type = 'FIS' THEN d.amount ELSE 0 END), 0) AS receipt_amt,
+		       COALESCE(SUM(d.reported), 0) AS reported_count
+		FROM companies c
+		LEFT JOIN documents d ON d.company_id = c.id
+		"""
+	params: Tuple = ()
+	if company_ids is not None:
+		placeholders = ",".join("?" for _ in company_ids)
+		sql += f" WHERE c.id IN ({placeholders}) "
+		params = tuple(int(cid) for cid in company_ids)
+	sql += " GROUP BY c.id ORDER BY c.id ASC"
+	rows = conn.execute(sql, params).fetchall()
+	if not rows:
+		return pd.DataFrame()
+
+	# SoA yerleşim: satır tuple listesi tek float64 bloğuna çevrilir,
+	# sütunlar dilim olarak okunur; DataFrame kopyasız kurulur
+	arr = np.asarray(rows, dtype=np.float64)
+	revenue = arr[:, 1]
+	expenses = arr[:, 2]
+	num_docs = arr[:, 3]
+	total_amount = arr[:, 4]
+	invoice_amt = arr[:, 5]
+	receipt_amt = arr[:, 6]
+	reported_count = arr[:, 7]
 
-		# Özellik vektörünü listeye ekle
-		features.append({
-			"company_id": cid,
-			"revenue": float(revenue),
-			"expenses": float(expenses),
-			"num_docs": float(num_docs),
-			"avg_amount": float(avg_amount),
-			"invoice_ratio": float(invoice_ratio),
-			"profit_margin": float(profit_margin),
-			"reported_ratio": float(reported_ratio),
-		})
-	return pd.DataFrame(features)
+	# Oranları vektörel hesapla (_safe_div ile aynı sıfıra bölme kuralları)
+	doc_total = invoice_amt + receipt_amt
+	safe_docs = np.maximum(1.0, num_docs)
+	return pd.DataFrame(
+		{
+			"company_id": arr[:, 0].astype(np.int64),
+			"revenue": revenue,
+			"expenses": expenses,
+			"num_docs": num_docs,
+			"avg_amount": total_amount / safe_docs,
+			"invoice_ratio": np.where(doc_total != 0, invoice_amt / np.where(doc_total != 0, doc_total, 1.0), 0.0),
+			"profit_margin": (revenue - expenses) / np.maximum(1.0, revenue),
+			"reported_ratio": reported_count / safe_docs,
+		},
+		copy=False,
+	)
 
 
-def _document_anomalies(db_path: str) -> float:
+def _document_anomalies(db_path: str, company_ids: Optional[List[int]] = None) -> float:
 	"""
 	Belge seviyesinde anomali tespiti yapar ve şüpheli belgeleri işaretler.
 	Her şirket için belge tutarlarını analiz ederek aykırı değerleri tespit eder.
-	
+
 	Robust Z-score yöntemi kullanılır (medyan mutlak sapma ile):
 	- Medyan ve MAD (Median Absolute Deviation) hesaplanır
 	- 3.5'ten büyük Z-score değerine sahip belgeler şüpheli olarak işaretlenir
-	
+
+	Hesaplamanın tamamı SQLite içinde yapılır: medyan ve MAD pencere
+	fonksiyonlarıyla (ROW_NUMBER/COUNT OVER, çift sayıda satırda iki orta
+	değerin ortalaması) bulunur, işaretleme tek UPDATE ... FROM ifadesiyle
+	yazılır. Belge satırları Python'a hiç taşınmaz.
+
 	Args:
 		db_path: Veritabanı dosya yolu
-		
+		company_ids: Yalnızca bu şirketlerin belgelerini yeniden işaretle
+			(opsiyonel; None = tümü). Medyan/MAD şirket bazında olduğundan
+			kapsamı daraltmak sonucu değiştirmez.
+
 	Returns:
-		Global şüpheli belge oranı (0.0 - 1.0 arası)
+		Tüm belgeler içindeki şüpheli belge oranı (0.0 - 1.0 arası).
+		Oran, company_ids verilse bile popülasyon genelinden hesaplanır.
 	"""
-	companies = list_companies(db_path)
-	all_docs = 0
-	suspicious_total = 0
-	
-	for (cid, *_rest) in companies:
-		docs = list_documents(cid, db_path)
-		if not docs:
-			continue
-		
-		# Belge tutarlarını pandas Series'e dönüştür
-		amounts = pd.Series([d[2] for d in docs], dtype=float)
-		
-		# Robust Z-score hesaplama: medyan ve medyan mutlak sapma kullanılır
-		median = float(amounts.median())
-		mad = float((amounts - median).abs().median()) or 1.0  # MAD, eğer 0 ise 1.0 kullan
-		robust_z = (amounts - median).abs() / (1.4826 * mad)  # 1.4826 normal dağılım için sabit
-		
-		# Her belgeyi kontrol et ve şüpheli olanları işaretle
-		for idx, d in enumerate(docs):
-			is_susp = bool(robust_z.iloc[idx] > 3.5)  # 3.5'ten büyükse şüpheli
-			mark_document_suspicious(d[0], is_susp, db_path=db_path)
-			suspicious_total += 1 if is_susp else 0
-			all_docs += 1
-	
-	# Global şüpheli belge oranını döndür
-	return (suspicious_total / all_docs) if all_docs else 0.0
+	conn = get_connection(db_path)
+	filter_sql = ""
+	params: Tuple = ()
+	if company_ids is not None:
+		placeholders = ",".join("?" for _ in company_ids)
+		filter_sql = f" WHERE company_id IN ({placeholders})"
+		params = tuple(int(cid) for cid in company_ids)
+
+	# ranked: her belgenin şirket içindeki tutar sırası ve şirket belge sayısı.
+	# med/madt: (cnt+1)/2 ve (cnt+2)/2 sıralarının ortalaması — tek sayıda
+	# satırda orta değer, çift sayıda iki orta değerin ortalaması (pandas
+	# medyanıyla aynı). MAD 0 ise 1.0 kullanılır.
+	sql = f"""
+		WITH ranked AS (
+			SELECT id, company_id, amount,
+			       ROW_NUMBER() OVER (PARTITION BY company_id ORDER BY amount) AS rn,
+			       COUNT(*) OVER (PARTITION BY company_id) AS cnt
+			FROM documents
+			{filter_sql}
+		),
+		med AS (
+			SELECT company_id, AVG(amount) AS median
+			FROM ranked
+			WHERE rn IN ((cnt + 1) / 2, (cnt + 2) / 2)
+			GROUP BY company_id
+		),
+		dev AS (
+			SELECT r.company_id,
+			       ABS(r.amount - m.median) AS abs_dev,
+			       ROW_NUMBER() OVER (PARTITION BY r.company_id ORDER BY ABS(r.amount - m.median)) AS rn,
+			       COUNT(*) OVER (PARTITION BY r.company_id) AS cnt
+			FROM ranked r
+			JOIN med m ON m.company_id = r.company_id
+		),
+		madt AS (
+			SELECT company_id, AVG(abs_dev) AS mad
+			FROM dev
+			WHERE rn IN ((cnt + 1) / 2, (cnt + 2) / 2)
+			GROUP BY company_id
+		)
+		UPDATE documents
+		SET suspicious = CASE
+			WHEN ABS(documents.amount - m.median)
+			     / (1.4826 * CASE WHEN t.mad = 0.0 THEN 1.0 ELSE t.mad END) > 3.5
+			THEN 1 ELSE 0 END
+		FROM med m, madt t
+		WHERE m.company_id = documents.company_id
+		  AND t.company_id = documents.company_id
+		"""
+	cur = conn.cursor()
+	cur.execute(sql, params)
+	conn.commit()
+
+	# Oran her zaman TÜM belgeler üzerinden okunur: risk formülündeki
+	# global şüpheli oranı, tek şirket yeniden hesaplansa bile popülasyon
+	# genelini yansıtmalıdır (company_ids yalnızca işaretleme kapsamını daraltır)
+	row = conn.execute("SELECT AVG(suspicious) FROM documents").fetchone()
+	return float(row[0]) if row and row[0] is not None else 0.0
+
+
+# Şirket anomali tespitinde kullanılan özellik sütunları
+FEATURE_COLUMNS = ["revenue", "expenses", "num_docs", "avg_amount", "invoice_ratio", "profit_margin", "reported_ratio"]
+
+
+# Belge taramasını şirket özellik çıkarımıyla örtüştürmek için tek
+# worker'lı kalıcı thread havuzu: worker thread yaşadığı sürece db.py'deki
+# thread başına bağlantı önbelleği aynı bağlantıyı yeniden kullanır
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+	"""
+	Modül seviyesindeki thread havuzunu döndürür (ilk çağrıda oluşturur).
+
+	Returns:
+		Tek worker'lı ThreadPoolExecutor nesnesi
+	"""
+	global _EXECUTOR
+	if _EXECUTOR is None:
+		_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+	return _EXECUTOR
+
+
+def _reset_executor_after_fork() -> None:
+	"""
+	fork sonrası alt süreçte havuz referansını sıfırlar.
+
+	Ebeveynden devralınan ThreadPoolExecutor'ın worker thread'i fork ile
+	ölür; submit edilen işler asla tamamlanmaz ve future.result() sonsuza
+	kadar bekler. Referans bırakılır (shutdown çağrılmaz), ilk kullanımda
+	alt süreç kendi havuzunu kurar.
+	"""
+	global _EXECUTOR
+	_EXECUTOR = None
+
+
+if hasattr(os, "register_at_fork"):
+	os.register_at_fork(after_in_child=_reset_executor_after_fork)
+
+
+def _company_anomaly_scores(df: pd.DataFrame, algorithm: str, random_state: int):
+	"""
+	Şirket seviyesinde anomali skorlarını hesaplar ve [0,1] aralığına
+	normalize eder (1 = en anormal).
+
+	İki algoritma desteklenir:
+	- "robust_z" (varsayılan): Her özellik medyan ve MAD ile standartlaştırılır,
+	  skor standartlaştırılmış vektörün L2 normudur. 7 özellik × ~1000 satır
+	  ölçeğinde IsolationForest ile benzer sıralamayı saf NumPy ile verir.
+	- "isolation_forest": Önceki davranış; 200 ağaçlık IsolationForest.
+
+	Args:
+		df: _company_features çıktısı DataFrame
+		algorithm: "robust_z" veya "isolation_forest"
+		random_state: IsolationForest için seed
+
+	Returns:
+		[0,1] aralığında anomali skorları (ndarray, 1 = yüksek risk)
+	"""
+	if algorithm == "isolation_forest":
+		# float32: IsolationForest içte zaten FP32'ye çevirir; önceden
+		# çevirmek ekstra kopyayı atlar ve bellek bant genişliğini yarılar
+		X = df[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+		model = IsolationForest(n_estimators=200, contamination=0.08, random_state=random_state)
+		model.fit(X)
+		scores = model.score_samples(X)  # Yüksek skor = daha az anormal
+		min_s, max_s = float(scores.min()), float(scores.max())
+		span = (max_s - min_s) or 1.0
+		return 1.0 - ((scores - min_s) / span)
+	# robust_z: sütun bazında medyan/MAD standartlaştırma + L2 norm
+	X = df[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+	median = np.median(X, axis=0)
+	mad = np.median(np.abs(X - median), axis=0)
+	mad = np.where(mad == 0, 1.0, mad)
+	Xs = (X - median) / (1.4826 * mad)
+	scores = np.linalg.norm(Xs, axis=1)  # Yüksek skor = daha anormal
+	min_s, max_s = float(scores.min()), float(scores.max())
+	span = (max_s - min_s) or 1.0
+	return (scores - min_s) / span
+
+
+def _score_kernel(anom_0_1, reported_ratio, suspicious_ratio_global):
+	"""
+	Risk skorlarını şirket başına tek geçişte hesaplayan sayısal çekirdek.
+
+	Saf NumPy/ndarray aritmetiği kullanır; numba kuruluysa makine koduna
+	JIT-derlenir. Ağırlıklar:
+	- %60: Şirket anomali skoru (0-1 arası)
+	- %25: Bildirilmemiş belge cezası (1 - bildirilen oran)
+	- %15: Global şüpheli belge oranı
+
+	Args:
+		anom_0_1: Şirket anomali skorları (float64 ndarray, 0-1 arası)
+		reported_ratio: Bildirilen belge oranları (float64 ndarray)
+		suspicious_ratio_global: Global şüpheli belge oranı (skaler)
+
+	Returns:
+		0-100 arası risk skorlarını içeren ndarray
+	"""
+	reported_penalty = 1.0 - reported_ratio
+	return (0.6 * anom_0_1 + 0.25 * reported_penalty + 0.15 * suspicious_ratio_global) * 100.0
+
+
+if njit is not None:
+	_score_kernel = njit(cache=True)(_score_kernel)
+	# JIT derlemesini import sırasında ısıt: ilk gerçek çağrı yavaş kalmasın
+	_score_kernel(np.zeros(2), np.zeros(2), 0.0)
 
 
 def _map_risk(score_0_100: float) -> str:
@@ -155,64 +326,82 @@ def _map_risk(score_0_100: float) -> str:
 	return "Yüksek"
 
 
-def compute_and_update_risk(db_path: str = "app.db", random_state: int = 42) -> None:
+def compute_and_update_risk(
+	db_path: str = "app.db",
+	random_state: int = 42,
+	company_ids: Optional[List[int]] = None,
+	algorithm: str = "robust_z",
+) -> None:
 	"""
 	Ana risk hesaplama ve güncelleme fonksiyonu.
-	
+
 	İşlem adımları:
 	1. Şirket özelliklerini çıkarır
-	2. Isolation Forest algoritması ile şirket seviyesinde anomali tespiti yapar
+	2. Şirket seviyesinde anomali tespiti yapar (robust z-score veya Isolation Forest)
 	3. Belge seviyesinde anomali tespiti yapar
 	4. Tüm faktörleri birleştirerek risk skoru hesaplar
 	5. Veritabanındaki şirket risk skorlarını günceller
-	
+
 	Risk skoru hesaplama formülü:
-	- %60: Şirket anomali skoru (Isolation Forest)
+	- %60: Şirket anomali skoru
 	- %25: Bildirilmemiş belge cezası
 	- %15: Global şüpheli belge oranı
-	
+
 	Args:
 		db_path: Veritabanı dosya yolu (varsayılan: "app.db")
 		random_state: Rastgele sayı üreteci seed değeri (varsayılan: 42)
+		company_ids: Yalnızca bu şirketlerin skorlarını veritabanına yaz
+			(opsiyonel). Özellikler ve anomali skorları her zaman TÜM
+			popülasyon üzerinden hesaplanır: tek satırlık bir popülasyonda
+			medyan satırın kendisi olacağından anomali terimi hep 0 çıkar
+			ve skorlar anlamsızlaşır. Filtre yalnızca belge işaretleme
+			kapsamını ve son UPDATE'i daraltır.
+		algorithm: Şirket anomali algoritması; "robust_z" (varsayılan, saf
+			NumPy) veya "isolation_forest" (önceki davranış).
 	"""
-	# Şirket özelliklerini çıkar
+	# Belge taraması ve şirket özellik çıkarımı bağımsızdır; belge tarafı
+	# ayrı thread'de başlatılır. WAL + thread başına bağlantı sayesinde
+	# iki taraf birbirini bloke etmez, duvar saati toplamdan max()'a iner.
+	future = _get_executor().submit(_document_anomalies, db_path, company_ids)
+
+	# Şirket özellikleri her zaman tüm popülasyondan çıkarılır; skorlar
+	# popülasyona göre anlamlıdır (tek GROUP BY sorgusu olduğundan ucuz)
 	df = _company_features(db_path)
 	if df.empty:
+		future.result()
 		return
 
-	# Isolation Forest ile anomali tespiti
-	# Düşük skorlar daha anormal şirketleri gösterir
-	model = IsolationForest(n_estimators=200, contamination=0.08, random_state=random_state)
-	X = df[["revenue", "expenses", "num_docs", "avg_amount", "invoice_ratio", "profit_margin", "reported_ratio"]]
-	model.fit(X)
-	scores = model.score_samples(X)  # Yüksek skor = daha az anormal
+	# Şirket seviyesinde anomali skorları ([0,1], 1 = yüksek risk)
+	anom_0_1 = _company_anomaly_scores(df, algorithm, random_state)
 
-	# Skorları [0,1] aralığına normalize et (1 = yüksek risk, ters çevir)
-	min_s, max_s = float(scores.min()), float(scores.max())
-	span = (max_s - min_s) or 1.0
-	anom_0_1 = 1.0 - ((scores - min_s) / span)
+	# Belge seviyesinde anomali tespiti sonucu (oran) worker'dan alınır
+	suspicious_ratio_global = future.result()
 
-	# Belge seviyesinde anomali tespiti
-	suspicious_ratio_global = _document_anomalies(db_path)
+	# Risk skorunu hesapla: tüm faktörler tek çekirdek çağrısında birleşir
+	risk_scores = _score_kernel(
+		np.asarray(anom_0_1, dtype=np.float64),
+		df["reported_ratio"].to_numpy(dtype=np.float64),
+		float(suspicious_ratio_global),
+	)
 
-	# Risk skorunu hesapla: tüm faktörleri birleştir
-	risk_scores = []
-	for i, row in df.iterrows():
-		# Bildirilmemiş belge cezası: daha fazla bildirilmemiş = daha yüksek risk
-		reported_penalty = 1.0 - float(row["reported_ratio"])
-		
-		# Ağırlıklı risk bileşenleri
-		company_weighted = 0.6 * float(anom_0_1[i])  # %60 şirket anomali skoru
-		report_weighted = 0.25 * float(reported_penalty)  # %25 bildirilmemiş belge cezası
-		doc_weighted = 0.15 * float(suspicious_ratio_global)  # %15 global şüpheli belge oranı
-		
-		# Toplam risk skoru (0-100 arası)
-		total = (company_weighted + report_weighted + doc_weighted) * 100.0
-		risk_scores.append(total)
-
-	# Veritabanını güncelle: her şirket için risk skoru ve seviyesini kaydet
-	for idx, cid in enumerate(df["company_id"].tolist()):
-		score = float(risk_scores[idx])
-		level = _map_risk(score)
-		update_company_risk(int(cid), score, level, db_path=db_path)
+	# Seviyeleri vektörel eşle (_map_risk ile aynı eşikler)
+	risk_scores = np.asarray(risk_scores, dtype=np.float64)
+	levels = np.where(risk_scores < 33.34, "Düşük", np.where(risk_scores < 66.67, "Riskli", "Yüksek"))
+
+	# Yalnızca istenen şirketlerin satırları yazılır (None = tümü)
+	ids = df["company_id"].to_numpy(dtype=np.int64)
+	if company_ids is not None:
+		mask = np.isin(ids, np.asarray(list(company_ids), dtype=np.int64))
+		risk_scores = risk_scores[mask]
+		levels = levels[mask]
+		ids = ids[mask]
+
+	# Veritabanını tek transaction içinde topluca güncelle
+	conn = get_connection(db_path)
+	cur = conn.cursor()
+	cur.executemany(
+		"UPDATE companies SET risk_score = ?, risk_level = ? WHERE id = ?",
+		list(zip(risk_scores.tolist(), levels.tolist(), ids.tolist())),
+	)
+	conn.commit()
 